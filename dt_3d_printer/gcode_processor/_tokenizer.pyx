@@ -0,0 +1,205 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""Byte-level G-code tokenizer producing rows for gcode_parser_kernels.run."""
+from libc.stdint cimport int64_t
+from libc.string cimport memchr, memcpy
+import numpy as np
+
+from dt_3d_printer.gcode_processor import gcode_parser_kernels as kernels
+
+
+cdef extern from "Python.h":
+    # Locale-independent and correctly rounded, like float()
+    double PyOS_string_to_double(const char *s, char **endptr, object overflow_exception) except? -1.0
+
+
+cdef int64_t OP_MOVE = kernels.OP_MOVE
+cdef int64_t OP_SET_POSITION = kernels.OP_SET_POSITION
+cdef int64_t OP_HOME = kernels.OP_HOME
+cdef int64_t OP_ABSOLUTE = kernels.OP_ABSOLUTE
+cdef int64_t OP_RELATIVE = kernels.OP_RELATIVE
+cdef int64_t OP_ABSOLUTE_E = kernels.OP_ABSOLUTE_E
+cdef int64_t OP_RELATIVE_E = kernels.OP_RELATIVE_E
+cdef int64_t OP_LAYER = kernels.OP_LAYER
+
+cdef int64_t XYZ_MASK = 0b00111
+cdef Py_ssize_t NUMBER_BUF_SIZE = 64
+
+
+cdef inline bint _is_digit(unsigned char c) noexcept nogil:
+    return c >= c'0' and c <= c'9'
+
+
+cdef inline int _axis_index(unsigned char c) noexcept nogil:
+    if c == c'X':
+        return 0
+    if c == c'Y':
+        return 1
+    if c == c'Z':
+        return 2
+    if c == c'E':
+        return 3
+    if c == c'F':
+        return 4
+    return -1
+
+
+cdef inline Py_ssize_t _number_end(const unsigned char *buf, Py_ssize_t i, Py_ssize_t end) noexcept nogil:
+    """Return the end of a [-+]?\\d*\\.?\\d+ number starting at i, or -1."""
+    cdef Py_ssize_t start
+    if i < end and (buf[i] == c'-' or buf[i] == c'+'):
+        i += 1
+    start = i
+    while i < end and _is_digit(buf[i]):
+        i += 1
+    if i + 1 < end and buf[i] == c'.' and _is_digit(buf[i + 1]):
+        i += 1
+        while i < end and _is_digit(buf[i]):
+            i += 1
+        return i
+    return i if i > start else -1
+
+
+cdef double _parse_number(const unsigned char *buf, Py_ssize_t start, Py_ssize_t end) except? -1.0:
+    cdef char number[64]
+    cdef Py_ssize_t length = end - start
+    if length >= NUMBER_BUF_SIZE:
+        return float(bytes(buf[start:end]))
+    memcpy(number, buf + start, length)
+    number[length] = 0
+    return PyOS_string_to_double(number, NULL, None)
+
+
+cdef int64_t _opcode(const unsigned char *buf, Py_ssize_t start, Py_ssize_t end) noexcept nogil:
+    """Classify the command word buf[start:end] (letter plus digits), or -1."""
+    cdef unsigned char letter = buf[start]
+    cdef Py_ssize_t digits = end - start - 1
+    cdef unsigned char d0, d1
+
+    if digits == 1:
+        d0 = buf[start + 1]
+        if letter == c'G' and (d0 == c'0' or d0 == c'1'):
+            return OP_MOVE
+        return -1
+    if digits != 2:
+        return -1
+
+    d0 = buf[start + 1]
+    d1 = buf[start + 2]
+    if letter == c'G':
+        if d0 == c'0' and (d1 == c'0' or d1 == c'1'):
+            return OP_MOVE
+        if d0 == c'2' and d1 == c'8':
+            return OP_HOME
+        if d0 == c'9':
+            if d1 == c'0':
+                return OP_ABSOLUTE
+            if d1 == c'1':
+                return OP_RELATIVE
+            if d1 == c'2':
+                return OP_SET_POSITION
+    elif letter == c'M' and d0 == c'8':
+        if d1 == c'2':
+            return OP_ABSOLUTE_E
+        if d1 == c'3':
+            return OP_RELATIVE_E
+    return -1
+
+
+def tokenize(const unsigned char[::1] data):
+    """
+    Split G-code bytes into rows for gcode_parser_kernels.run.
+
+    Recognizes the same lines as gcode_parser._LINE_RE and the same axis
+    parameters as gcode_parser._PARAM_RE, without creating Python objects
+    for command lines.
+
+    Args:
+        data: G-code content as a bytes-like object
+
+    Returns:
+        Tuple of (opcodes, axis_masks, values, comments). values has shape
+        (N, 5); comments lists (row, body) for every comment line in order,
+        where row is the OP_LAYER row reserved for a LAYER comment (its
+        layer number is left for the caller to fill in) or -1 otherwise.
+    """
+    cdef const unsigned char *buf = &data[0] if data.shape[0] else NULL
+    cdef Py_ssize_t size = data.shape[0]
+    cdef Py_ssize_t max_rows = 1
+    cdef Py_ssize_t i, j, k, line_end, params_end, number_end
+    cdef Py_ssize_t row = 0
+    cdef int64_t op, mask
+    cdef int axis
+    cdef const unsigned char *newline
+
+    for i in range(size):
+        if buf[i] == c'\n':
+            max_rows += 1
+
+    opcodes = np.empty(max_rows, dtype=np.int64)
+    masks = np.zeros(max_rows, dtype=np.int64)
+    values = np.zeros((max_rows, 5), dtype=np.float64)
+    cdef int64_t[::1] opcode_view = opcodes
+    cdef int64_t[::1] mask_view = masks
+    cdef double[:, ::1] value_view = values
+    comments = []
+
+    i = 0
+    while i < size:
+        newline = <const unsigned char *>memchr(buf + i, c'\n', size - i)
+        line_end = newline - buf if newline != NULL else size
+
+        j = i
+        while j < line_end and (buf[j] == c' ' or buf[j] == c'\t'):
+            j += 1
+
+        if j < line_end and buf[j] == c';':
+            # Only ;LAYER: directly after the semicolon marks a layer
+            k = j + 1
+            if line_end - k >= 6 and buf[k] == c'L' and buf[k + 1] == c'A' and buf[k + 2] == c'Y' \
+                    and buf[k + 3] == c'E' and buf[k + 4] == c'R' and buf[k + 5] == c':':
+                opcode_view[row] = OP_LAYER
+                comments.append((row, bytes(data[j + 1:line_end])))
+                row += 1
+            else:
+                comments.append((-1, bytes(data[j + 1:line_end])))
+
+        elif j < line_end and (buf[j] == c'G' or buf[j] == c'M'):
+            k = j + 1
+            while k < line_end and _is_digit(buf[k]):
+                k += 1
+            op = -1
+            if k == line_end or buf[k] != c'.':
+                op = _opcode(buf, j, k)
+
+            if op >= 0:
+                newline = <const unsigned char *>memchr(buf + k, c';', line_end - k)
+                params_end = newline - buf if newline != NULL else line_end
+                mask = 0
+
+                if op == OP_HOME:
+                    for k in range(k, params_end):
+                        axis = _axis_index(buf[k])
+                        if 0 <= axis < 3:
+                            mask |= 1 << axis
+                    if mask == 0:
+                        mask = XYZ_MASK
+
+                else:
+                    while k < params_end:
+                        axis = _axis_index(buf[k])
+                        if axis >= 0:
+                            number_end = _number_end(buf, k + 1, params_end)
+                            if number_end >= 0:
+                                value_view[row, axis] = _parse_number(buf, k + 1, number_end)
+                                mask |= 1 << axis
+                                k = number_end
+                                continue
+                        k += 1
+
+                opcode_view[row] = op
+                mask_view[row] = mask
+                row += 1
+
+        i = line_end + 1
+
+    return opcodes[:row], masks[:row], values[:row], comments
@@ -1,29 +1,113 @@
+import functools
+import mmap
+import os
 import re
+from array import array
+from types import MappingProxyType
 from pathlib import Path
-from typing import Dict, List, Union, Optional
+from typing import Dict, List, Mapping, Tuple, Union, Optional
+import numpy as np
 from dt_3d_printer.utilities import secrets_utils
 
 
 SECRETS_PATH = Path("secrets.json")
+AXES = ("X", "Y", "Z", "E", "F")
+X, Y, Z, E, F = range(len(AXES))
+# G-code is scanned as bytes; only comment bodies are decoded to str
+_AXIS_INDEX = {axis.encode(): i for i, axis in enumerate(AXES)}
+_PARAM_RE = re.compile(rb"([XYZEF])([-+]?\d*\.?\d+)")
+# One match per relevant line: either a comment body or a supported command
+# followed by its parameters. Lines with other commands are never visited.
+_LINE_RE = re.compile(
+    rb"^[ \t]*(?:;(?P<comment>[^\n]*)"
+    rb"|(?P<code>G0?[01]|G28|G9[012]|M8[23])(?![\d.])(?P<params>[^\n;]*))",
+    re.MULTILINE)
+
+@functools.lru_cache(maxsize=None)
+def _fast_path():
+    """
+    Import the compiled kernel and tokenizer on first use.
+
+    numba is only loaded here, so plain parse_gcode callers never pay for it.
+
+    Returns:
+        (gcode_parser_kernels, tokenize), or None if numba or the built
+        _tokenizer extension is unavailable
+    """
+    try:
+        from dt_3d_printer.gcode_processor import gcode_parser_kernels as kernels
+        from dt_3d_printer.gcode_processor._tokenizer import tokenize
+    except ImportError:
+        return None
+    if not kernels.NUMBA_AVAILABLE:
+        return None
+    return kernels, tokenize
 
 class GCodeParser:
     """Parse GCode files and extract movement data organized by layers."""
 
     def __init__(self):
         """Initialize the GCode parser with default values."""
-        self.current_position = {"X": 0.0, "Y": 0.0, "Z" : 0.0, "E": 0.0, "F":0.0}
+        # Position and emitted points are kept as flat X, Y, Z, E, F slots.
+        # Points of all layers share one growable float64 buffer, with each
+        # point's layer in a parallel int64 buffer; per-layer arrays are only
+        # split out in get_absolute_coordinates.
+        self._pos = [0.0] * len(AXES)
+        self._points = array("d")
+        self._point_layers = array("q")
+        # Layers named by ;LAYER: comments, in order of first appearance, and
+        # the number of points emitted before the first of them
+        self._marker_layers = {}
+        self._points_before_markers = None
         self.absolute_positioning = True
         self.absolute_extrusion = True
         self.current_layer = 0
-        # self.layer_data = {}
-        self.parsed_data = {
+        # Metadata fills in while parsing; "layers" is only built from the
+        # point buffers by get_absolute_coordinates (see parsed_data)
+        self._parsed_data = {
             "metadata":{},
             "layers":{}
         }
+        # Command word -> handler taking the command's parameter text
+        self._handlers = {
+            b"G0": self._process_movement,
+            b"G00": self._process_movement,
+            b"G1": self._process_movement,
+            b"G01": self._process_movement,
+            b"G28": self._process_home,
+            b"G92": self._process_set_position,
+            b"G90": lambda params: setattr(self, "absolute_positioning", True),
+            b"G91": lambda params: setattr(self, "absolute_positioning", False),
+            b"M82": lambda params: setattr(self, "absolute_extrusion", True),
+            b"M83": lambda params: setattr(self, "absolute_extrusion", False),
+        }
+
+    @property
+    def parsed_data(self) -> Dict:
+        """Metadata and per-layer points parsed so far, as returned by get_absolute_coordinates."""
+        return self.get_absolute_coordinates()
+
+    @property
+    def current_position(self) -> Mapping[str, float]:
+        """
+        Current position keyed by axis letter.
+
+        This is a read-only snapshot; assign a dict of axis values to the
+        attribute to move the parser's position.
+        """
+        return MappingProxyType(dict(zip(AXES, self._pos)))
+
+    @current_position.setter
+    def current_position(self, position : Mapping[str, float]) -> None:
+        for axis in position:
+            if axis not in AXES:
+                raise KeyError(f"Unknown axis: {axis}")
+        for axis, value in position.items():
+            self._pos[AXES.index(axis)] = float(value)
 
     def parse_gcode(self, gcode : str) -> None:
         """
-        Parse GCode content and populate the parsed_data structure.
+        Parse GCode content and record its points and metadata.
         
         Args:
             gcode: String containing GCode commands
@@ -31,150 +115,333 @@ class GCodeParser:
         if not gcode:
             raise ValueError("Empty GCode input")
 
-        lines = gcode.split("\n")
+        self.parse_gcode_bytes(gcode.encode("utf-8"))
 
-        for line_num, line in enumerate(lines,1):
-            try: 
-                line = line.strip()
-                if not line:
-                    continue
+    def parse_gcode_bytes(self, gcode : Union[bytes, mmap.mmap]) -> None:
+        """
+        Parse UTF-8 encoded GCode content and record its points and metadata.
 
-                if line.startswith(";"):
-                    self._parse_comment(line)
-                    continue
+        Accepts any bytes-like object, so a memory-mapped file can be parsed
+        in place without reading it into a str first.
+        
+        Args:
+            gcode: Bytes-like object containing GCode commands
+        """
+        if not gcode:
+            raise ValueError("Empty GCode input")
 
-                line = line.split(";")[0].strip()
-                if line:
-                    self._process_command(line)
+        # _LINE_RE only yields command words that have a handler, so commands
+        # dispatch with a single lookup and call
+        handlers = self._handlers
+        for match in _LINE_RE.finditer(gcode):
+            try:
+                comment, code, params = match.group("comment", "code", "params")
+                if code is None:
+                    self._parse_comment(comment.decode("utf-8", errors="replace").rstrip())
+                else:
+                    handlers[code](params)
 
             except Exception as e:
-                raise RuntimeError(f"Error in parsing line {line_num}: {line}\n Error: {str(e)}")
+                raise self._line_error(gcode, match, e)
+
+    def parse_gcode_fast(self, gcode : Union[str, bytes, mmap.mmap]) -> None:
+        """
+        Parse GCode content using the compiled tokenizer and positioning kernel.
+
+        The _tokenizer extension scans relevant lines into opcode, axis mask
+        and value arrays, and gcode_parser_kernels.run replays them without
+        per-line Python overhead. Falls back to parse_gcode_bytes when numba
+        is missing or the extension is not built, since scanning rows in
+        Python costs as much as parsing them directly.
+
+        Args:
+            gcode: String or UTF-8 bytes-like object containing GCode commands
+        """
+        if not gcode:
+            raise ValueError("Empty GCode input")
+
+        if isinstance(gcode, str):
+            gcode = gcode.encode("utf-8")
+
+        fast_path = _fast_path()
+        if fast_path is None:
+            self.parse_gcode_bytes(gcode)
+            return
+
+        kernels, tokenize = fast_path
+        self._run_kernel(kernels, *self._tokenize_rows(tokenize, gcode))
+
+    def _tokenize_rows(self, tokenize, gcode : Union[bytes, mmap.mmap]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, List[int], Optional[int]]:
+        """
+        Scan GCode bytes into kernel rows using the compiled tokenizer.
+
+        Metadata comments are recorded while scanning.
+        
+        Args:
+            tokenize: _tokenizer.tokenize
+            gcode: Bytes-like object containing GCode commands
+
+        Returns:
+            Opcodes, axis masks, (N, 5) values, the layer numbers of ;LAYER:
+            markers in order and the row of the first marker (None if absent)
+        """
+        opcodes, masks, values, comments = tokenize(gcode)
+        marker_layers = []
+        first_marker_row = None
+
+        for row, body in comments:
+            comment = body.decode("utf-8", errors="replace").rstrip()
+            if row < 0:
+                self._parse_comment(comment)
+                continue
+            layer = self._layer_number(comment)
+            values[row, 0] = layer
+            marker_layers.append(layer)
+            if first_marker_row is None:
+                first_marker_row = row
+
+        return opcodes, masks, values, marker_layers, first_marker_row
+
+    def _run_kernel(self, kernels, opcodes : np.ndarray, masks : np.ndarray, values : np.ndarray,
+                    marker_layers : List[int], first_marker_row : Optional[int]) -> None:
+        """
+        Replay kernel rows and store the emitted points.
+        
+        Args:
+            kernels: gcode_parser_kernels module
+            opcodes: OP_* id of each row
+            masks: Axis bit mask of each row
+            values: (N, 5) axis values of each row
+            marker_layers: Layer numbers of ;LAYER: markers in order
+            first_marker_row: Row of the first marker, None if there is none
+        """
+        total = len(opcodes)
+        pos = np.array(self._pos, dtype=np.float64)
+        modes = np.array([self.absolute_positioning, self.absolute_extrusion,
+                          self.current_layer], dtype=np.int64)
+        # A row emits at most one point, so the row count bounds the output
+        out_xyzef = np.empty((total, len(AXES)), dtype=np.float64)
+        out_layer = np.empty(total, dtype=np.int64)
+
+        # Rows before the first ;LAYER: marker are replayed separately so the
+        # points they emit are counted before the markers are registered.
+        split = total if first_marker_row is None else first_marker_row
+        n = kernels.run(opcodes[:split], masks[:split], values[:split],
+                        pos, modes, out_xyzef, out_layer)
+        self._points.frombytes(out_xyzef[:n].tobytes())
+        self._point_layers.frombytes(out_layer[:n].tobytes())
+
+        for layer in marker_layers:
+            self._add_marker_layer(layer)
+
+        n = kernels.run(opcodes[split:], masks[split:], values[split:],
+                        pos, modes, out_xyzef, out_layer)
+        self._points.frombytes(out_xyzef[:n].tobytes())
+        self._point_layers.frombytes(out_layer[:n].tobytes())
+
+        self._pos = pos.tolist()
+        self.absolute_positioning = bool(modes[kernels.MODE_ABSOLUTE])
+        self.absolute_extrusion = bool(modes[kernels.MODE_ABSOLUTE_E])
+        self.current_layer = int(modes[kernels.MODE_LAYER])
+
+    @staticmethod
+    def _line_error(gcode : Union[bytes, mmap.mmap], match : re.Match, error : Exception) -> RuntimeError:
+        """
+        Build the error raised when a matched line fails to parse.
+        
+        Args:
+            gcode: Full GCode content being parsed
+            match: Match of the failing line
+            error: Original exception
+
+        Returns:
+            RuntimeError naming the line number and content
+        """
+        line_num = gcode[:match.start()].count(b"\n") + 1
+        line = match.group(0).decode("utf-8", errors="replace").strip()
+        return RuntimeError(f"Error in parsing line {line_num}: {line}\n Error: {str(error)}")
+
+    @staticmethod
+    def _layer_number(comment_line : str) -> int:
+        """
+        Extract the layer number from a LAYER comment, defaulting to 0.
+        
+        Args:
+            comment_line: Body of a ;LAYER: comment
+        """
+        try:
+            return int(comment_line.split(":")[1])
+        except ValueError:
+            return 0
+
+    def _add_marker_layer(self, layer : int) -> None:
+        """
+        Record a layer named by a ;LAYER: comment.
+        
+        Args:
+            layer: Layer number from the comment
+        """
+        if self._points_before_markers is None:
+            self._points_before_markers = len(self._point_layers)
+        self._marker_layers[layer] = None
 
     def _parse_comment(self, comment_line : str) -> None:
         """
         Extract metadata from comment lines.
         
         Args:
-            comment_line: A GCode comment line (starting with ;)
+            comment_line: Body of a GCode comment line (without the leading ;)
         """
 
-        if comment_line.startswith(";LAYER:"):
-            try:
-                self.current_layer = int(comment_line.split(":")[1])
-            except ValueError:
-                self.current_layer = 0
-            
-            if self.current_layer not in self.parsed_data['layers']:
-                self.parsed_data['layers'][self.current_layer] = []
+        if comment_line.startswith("LAYER:"):
+            self.current_layer = self._layer_number(comment_line)
+            self._add_marker_layer(self.current_layer)
         
         elif ":" in comment_line:
             key_val = comment_line.lstrip(";").split(":",1)
             if len(key_val) == 2:
                 key, value = key_val
-                self.parsed_data["metadata"][key.strip()] = value.strip()
+                self._parsed_data["metadata"][key.strip()] = value.strip()
 
-    def _process_command(self, command : str) -> None:
+    @staticmethod
+    def _home_mask(params : bytes) -> int:
         """
-        Process a GCode command and update internal state.
+        Get the axes homed by a G28 command.
         
         Args:
-            command: A GCode command without comments
-        """
-        
-        if command == "G90":
-            self.absolute_positioning = True    
-        elif command == "G91":
-            self.absolute_positioning = False
-        elif command == "M82":
-            self.absolute_extrusion = True
-        elif command == "M83":
-            self.absolute_extrusion = False
+            params: Parameters of a G28 command
 
-        elif command == "G28":
-            self.current_position.update({"X": 0, "Y": 0, "Z" : 0})
+        Returns:
+            Bit mask of the named X, Y, Z axes, or of all three if none is named
+        """
+        mask = 0
+        for axis, i in ((b"X", X), (b"Y", Y), (b"Z", Z)):
+            if axis in params:
+                mask |= 1 << i
+        return mask or (1 << X) | (1 << Y) | (1 << Z)
 
-        elif command.startswith("G0") or command.startswith("G1"):
-            self._process_movement(command)
-        
-        elif command.startswith("G92"):
-            self._process_set_position(command)
+    def _process_home(self, command : bytes) -> None:
+        """
+        Process a home command (G28) by zeroing the homed axes.
         
-    def _parse_params(self,command : str) -> Dict[str, str]:
+        Args:
+            command: Parameters of a G28 command
         """
-        Extract parameters from a GCode command.
+        mask = self._home_mask(command)
+        for i in (X, Y, Z):
+            if mask & (1 << i):
+                self._pos[i] = 0.0
+
+    def _parse_params(self,command : bytes) -> Tuple[int, List[float]]:
+        """
+        Extract axis parameters from a GCode command.
         
         Args:
             command: GCode command to parse
             
         Returns:
-            Dictionary of axis letters to values
+            Bit mask with bit i set for each given axis, and the X, Y, Z, E, F
+            values indexed the same way (0.0 where not given)
         """
-        matches = re.findall(f"([XYZEFS])([-+]?[0-9]*\.?[0-9]+)",command)
-        return {axis: float(value) for axis, value in matches}
+        mask = 0
+        values = [0.0] * len(AXES)
+        for axis, value in _PARAM_RE.findall(command):
+            i = _AXIS_INDEX[axis]
+            values[i] = float(value)
+            mask |= 1 << i
+        return mask, values
 
-    def _process_movement(self,command:str) -> None:
+    def _process_movement(self,command:bytes) -> None:
         """
         Process a movement command (G0/G1) and update position.
         
         Args:
-            command: A GCode movement command
+            command: Parameters of a GCode movement command
         """
 
-        params = self._parse_params(command)
+        mask, values = self._parse_params(command)
+        pos = self._pos
 
-        if "F" in params:
-            self.current_position["F"] = params["F"]
+        if mask & (1 << F):
+            pos[F] = values[F]
         
-        new_position = self.current_position.copy()
-        for axis in ["X","Y","Z", "E"]:
-            if axis in params:
-                if (self.absolute_positioning or 
-                    (axis=="E" and self.absolute_extrusion)):
-                    new_position[axis] = params[axis]
-                else:
-                    new_position[axis] += params[axis]
-        if (new_position["X"]!= self.current_position["X"] or
-            new_position["Y"]!= self.current_position["Y"] or
-            new_position["Z"]!= self.current_position["Z"] or
-            new_position["E"]!= self.current_position["E"]):
-
-            point = {
-                "X": new_position["X"],
-                "Y": new_position["Y"],
-                "Z": new_position["Z"],
-                "E": new_position["E"],
-                "F": new_position["F"]
-            }
-
-            if self.current_layer not in self.parsed_data["layers"]:
-                self.parsed_data["layers"][self.current_layer] = []
-            
-            self.parsed_data["layers"][self.current_layer].append(point)
+        changed = False
+        for i in (X, Y, Z, E):
+            if mask & (1 << i):
+                value = values[i]
+                if not (self.absolute_positioning or 
+                        (i == E and self.absolute_extrusion)):
+                    value += pos[i]
+                if value != pos[i]:
+                    pos[i] = value
+                    changed = True
 
-        self.current_position = new_position
+        if changed:
+            self._points.extend(pos)
+            self._point_layers.append(self.current_layer)
     
     
-    def _process_set_position(self,command:str) -> None:
+    def _process_set_position(self,command:bytes) -> None:
         """
         Process a position setting command (G92).
         
         Args:
-            command: G92 command with position values
+            command: Parameters of a G92 command with position values
         """
-        params = self._parse_params(command)
+        mask, values = self._parse_params(command)
 
-        for axis, value in params.items():
-            if axis in self.current_position:
-                self.current_position[axis] = float(value)
+        for i in range(len(AXES)):
+            if mask & (1 << i):
+                self._pos[i] = values[i]
 
     def get_absolute_coordinates(self) -> Dict:
         """
         Get the parsed GCode data.
         
         Returns:
-            Dictionary containing metadata and layer-organized coordinate data
+            Dictionary containing metadata and, per layer, an (N, 5) float64
+            array of X, Y, Z, E, F points
         """
-        return self.parsed_data
+        # Copies, so the buffers can keep growing if parsing continues
+        points = np.frombuffer(self._points, dtype=np.float64).reshape(-1, len(AXES)).copy()
+        layers = np.frombuffer(self._point_layers, dtype=np.int64).copy()
+
+        # Points arrive in runs of one layer; a layer revisited later in the
+        # file has several runs, which are concatenated.
+        bounds = np.flatnonzero(np.diff(layers)) + 1
+        runs = {}
+        for start, stop in zip([0, *bounds], [*bounds, len(layers)]):
+            if stop > start:
+                runs.setdefault(int(layers[start]), []).append(points[start:stop])
+
+        # Layers are listed in order of first appearance. Points emitted
+        # before any ;LAYER: comment all belong to the initial layer, which
+        # then comes ahead of every marker layer.
+        order = {}
+        if len(layers) and self._points_before_markers != 0:
+            order[int(layers[0])] = None
+        order.update(self._marker_layers)
+
+        empty = np.empty((0, len(AXES)), dtype=np.float64)
+        self._parsed_data["layers"] = {
+            layer: np.concatenate(runs[layer]) if layer in runs else empty.copy()
+            for layer in order
+        }
+        return self._parsed_data
+
+    def view_dict(self, layer : int) -> List[Dict[str, float]]:
+        """
+        Get the points of a layer as dictionaries keyed by axis letter.
+        
+        Args:
+            layer: Layer number
+
+        Returns:
+            List of points in the {"X", "Y", "Z", "E", "F"} dictionary format
+        """
+        points = np.frombuffer(self._points, dtype=np.float64).reshape(-1, len(AXES))
+        layers = np.frombuffer(self._point_layers, dtype=np.int64)
+        return [dict(zip(AXES, point)) for point in points[layers == layer].tolist()]
     
 
 def main():
@@ -183,11 +450,12 @@ def main():
     try:
         file_path = secrets_utils.get_value_from_json(SECRETS_PATH,"parser","gcode_file")
 
-        with open(file_path) as f:
-            gcode = f.read()
-
         parser = GCodeParser()
-        parser.parse_gcode(gcode)
+        with open(file_path, "rb") as f:
+            if not os.fstat(f.fileno()).st_size:
+                raise ValueError("Empty GCode input")
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as gcode:
+                parser.parse_gcode_bytes(gcode)
         coordinates = parser.get_absolute_coordinates()
         
         print(f"Found {len(coordinates['layers'])} layers")
@@ -198,8 +466,8 @@ def main():
         for layer, points in coordinates['layers'].items():
             print(f"\nLayer {layer}:")
             
-            for i,point in enumerate(points[:3]):
-                print(f"    {i+1}. X:{point['X']:.3f} Y:{point['Y']:.3f} Z:{point['Z']:.3f} E:{point['E']:.3f} F:{point['F']}")
+            for i, (x, y, z, e, f) in enumerate(points[:3]):
+                print(f"    {i+1}. X:{x:.3f} Y:{y:.3f} Z:{z:.3f} E:{e:.3f} F:{f}")
             if len(points)>3:
                 print(f" ... and {len(points)-3} more points")
     
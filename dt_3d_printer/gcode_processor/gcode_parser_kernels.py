@@ -0,0 +1,111 @@
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """Fallback that leaves the kernel as plain Python when numba is missing."""
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+
+# Opcode ids produced by the _tokenizer extension for each relevant G-code row
+OP_MOVE = 0
+OP_SET_POSITION = 1
+OP_HOME = 2
+OP_ABSOLUTE = 3
+OP_RELATIVE = 4
+OP_ABSOLUTE_E = 5
+OP_RELATIVE_E = 6
+OP_LAYER = 7
+
+# Indices into the modes state array
+MODE_ABSOLUTE = 0
+MODE_ABSOLUTE_E = 1
+MODE_LAYER = 2
+
+_XYZ_MASK = 0b00111
+_E_MASK = 0b01000
+_F_MASK = 0b10000
+
+
+@njit(cache=True)
+def run(opcodes, axis_mask, vals, pos, modes, out_xyzef, out_layer):
+    """
+    Replay tokenized G-code rows through the positioning state machine.
+
+    Args:
+        opcodes: int array of OP_* ids, one per row
+        axis_mask: int array with bit i set when axis i (X, Y, Z, E, F) is given
+        vals: float64 array of shape (N, 5) holding the given axis values;
+            for OP_LAYER rows column 0 holds the layer number
+        pos: float64[5] current position, updated in place
+        modes: int64[3] absolute positioning flag, absolute extrusion flag
+            and current layer, updated in place
+        out_xyzef: float64 array of shape (>=N, 5) receiving emitted points
+        out_layer: int64 array of shape (>=N,) receiving each point's layer
+
+    Returns:
+        Number of points written to the output buffers
+    """
+    n = 0
+    for i in range(opcodes.shape[0]):
+        op = opcodes[i]
+        mask = axis_mask[i]
+
+        if op == OP_MOVE:
+            if mask & _F_MASK:
+                pos[4] = vals[i, 4]
+
+            # Axes whose values are offsets from the current position
+            rel_mask = 0
+            if not modes[MODE_ABSOLUTE]:
+                rel_mask = _XYZ_MASK
+                if not modes[MODE_ABSOLUTE_E]:
+                    rel_mask |= _E_MASK
+
+            changed = False
+            for axis in range(4):
+                bit = 1 << axis
+                if mask & bit:
+                    value = vals[i, axis]
+                    if rel_mask & bit:
+                        value += pos[axis]
+                    if value != pos[axis]:
+                        pos[axis] = value
+                        changed = True
+
+            if changed:
+                out_xyzef[n, :] = pos
+                out_layer[n] = modes[MODE_LAYER]
+                n += 1
+
+        elif op == OP_SET_POSITION:
+            for axis in range(5):
+                if mask & (1 << axis):
+                    pos[axis] = vals[i, axis]
+
+        elif op == OP_HOME:
+            home_mask = mask & _XYZ_MASK
+            if home_mask == 0:
+                home_mask = _XYZ_MASK
+            for axis in range(3):
+                if home_mask & (1 << axis):
+                    pos[axis] = 0.0
+
+        elif op == OP_ABSOLUTE:
+            modes[MODE_ABSOLUTE] = 1
+        elif op == OP_RELATIVE:
+            modes[MODE_ABSOLUTE] = 0
+        elif op == OP_ABSOLUTE_E:
+            modes[MODE_ABSOLUTE_E] = 1
+        elif op == OP_RELATIVE_E:
+            modes[MODE_ABSOLUTE_E] = 0
+        elif op == OP_LAYER:
+            modes[MODE_LAYER] = np.int64(vals[i, 0])
+
+    return n
@@ -1,22 +1,71 @@
+import functools
+import signal
 import subprocess
-import json
-from stl import mesh
+import struct
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import os
+import stat
 from typing import Union, Optional
-from dt_3d_printer.utilities import secrets_utils
+from dt_3d_printer.utilities import json_utils, secrets_utils
 
 
 SECRETS_PATH = Path("secrets.json")
 DEFAULT_TIMEOUT = 300
 REQUIRED_CONFIG_FIELDS = ["version", "inherits", "overrides"]
+STDOUT_TAIL_LINES = 10
+KILL_GRACE_PERIOD = 5
+STL_HEADER_SIZE = 80
+STL_TRIANGLE_SIZE = 50
+
+# The validation checks run on worker threads; whole status lines are printed
+# under this lock so their output does not interleave
+_print_lock = threading.Lock()
+
+
+def _print_status(*args) -> None:
+    """Print a status line from a validation check without interleaving."""
+    with _print_lock:
+        print(*args)
 
 def validate_environment(cura_engine_path: Path) -> bool:
     """
     Validate that CuraEngine is available and working.
     
+    The probe result is cached per executable path and modification time,
+    so repeated slices only re-run CuraEngine after the binary changes.
+    
+    Args:
+        cura_engine_path: Path to the CuraEngine executable
+        
+    Returns:
+        True if validation passes
+        
+    Raises:
+        RuntimeError: If CuraEngine is not found or fails to run
+    """
+
+    try:
+        mtime_ns = os.stat(cura_engine_path).st_mtime_ns
+    except FileNotFoundError:
+        raise RuntimeError(f"CuraEngine not found at {cura_engine_path}")
+
+    return _validated_engine(str(cura_engine_path), mtime_ns)
+
+
+@functools.lru_cache(maxsize=8)
+def _validated_engine(cura_engine_path : str, mtime_ns : int) -> bool:
+    """
+    Run CuraEngine once to confirm it prints its version.
+    
+    Failures raise and are therefore not cached.
+    
     Args:
         cura_engine_path: Path to the CuraEngine executable
+        mtime_ns: Modification time of the executable, part of the cache key
         
     Returns:
         True if validation passes
@@ -27,7 +76,7 @@ def validate_environment(cura_engine_path: Path) -> bool:
 
     try:
         result = subprocess.run(
-            [str(cura_engine_path),"help"],
+            [cura_engine_path,"help"],
             capture_output=True,
             text=True,
             timeout=5
@@ -39,7 +88,7 @@ def validate_environment(cura_engine_path: Path) -> bool:
             raise RuntimeError("CuraEngine output did not contain version info.")
         
         version_line = version_lines[0]
-        print("CuraEngine found:", version_line.strip())
+        _print_status("CuraEngine found:", version_line.strip())
         return True
 
     except FileNotFoundError:
@@ -71,12 +120,11 @@ def validate_config(config_path : Path) -> bool:
         raise FileNotFoundError(f"Config file not found: {config_path}")
     
     try:
-        with open(config_path, "r", encoding="utf-8") as f:
-            config = json.load(f)
+        config = json_utils.load_json(config_path)
         
         missing_fields = [field for field in REQUIRED_CONFIG_FIELDS if field not in config]
         if missing_fields:
-            print(f"Config file missing recommended fields: {', '.join(missing_fields)}")
+            _print_status(f"Config file missing recommended fields: {', '.join(missing_fields)}")
         
         #for field in REQUIRED_CONFIG_FIELDS:
         #    if field not in config:
@@ -85,7 +133,7 @@ def validate_config(config_path : Path) -> bool:
         return True  
     
 
-    except json.JSONDecodeError as e:
+    except json_utils.JSONDecodeError as e:
         raise ValueError(f"Invalid JSON in config file: {str(e)}")
     except Exception as e:
         raise RuntimeError(f"Config file validation failed: {str(e)}")
@@ -107,15 +155,50 @@ def validate_stl(stl_path : Path) -> bool:
     # stl_path = Path(stl_path)
 
     try: 
-        stl_mesh = mesh.Mesh.from_file(stl_path)
-        print(f"STL is valid and contains {len(stl_mesh.vectors)} triangles")
-        return True
+        triangle_count = _fast_stl_check(Path(stl_path))
     except Exception as e:
         raise RuntimeError(f"STL Error: {e}")
 
+    if triangle_count is None:
+        _print_status("STL is a valid ASCII STL")
+    else:
+        _print_status(f"STL is valid and contains {triangle_count} triangles")
+    return True
+
+def _fast_stl_check(stl_path : Path) -> Optional[int]:
+    """
+    Check the structure of an STL file without loading its triangles.
+
+    A binary STL is valid when its size matches the triangle count stored
+    after the 80-byte header; otherwise the file must start with "solid".
+    
+    Args:
+        stl_path: Path to the STL file
+        
+    Returns:
+        Triangle count for a binary STL, None for an ASCII STL
+        
+    Raises:
+        ValueError: If the file is neither a binary nor an ASCII STL
+    """
+    file_size = stl_path.stat().st_size
+
+    with open(stl_path, "rb") as f:
+        head = f.read(STL_HEADER_SIZE + 4)
+
+    if len(head) == STL_HEADER_SIZE + 4:
+        (triangle_count,) = struct.unpack_from("<I", head, STL_HEADER_SIZE)
+        if file_size == STL_HEADER_SIZE + 4 + STL_TRIANGLE_SIZE * triangle_count:
+            return triangle_count
+
+    if head.lstrip().startswith(b"solid"):
+        return None
+
+    raise ValueError(f"{stl_path} is not a valid binary or ASCII STL file")
+
 def check_file_access(file_path : Path) -> bool:
     """
-    Check if a file can be accessed, using platform-appropriate methods.
+    Check if a file can be opened for reading.
     
     Args:
         file_path: Path to check
@@ -123,14 +206,29 @@ def check_file_access(file_path : Path) -> bool:
     Returns:
         True if file is accessible
     """
-    if not file_path.exists():
-        return False
     try:
-        with open(file_path, 'r') as f:
-            f.read(1)  # Try to read one byte
-        return True
-    except Exception:
+        fd = os.open(os.fspath(file_path), os.O_RDONLY)
+    except OSError:
         return False
+    try:
+        # Directories open fine on POSIX but are not readable files
+        return stat.S_ISREG(os.fstat(fd).st_mode)
+    finally:
+        os.close(fd)
+
+
+@functools.lru_cache(maxsize=8)
+def _resolve_engine_path(configured_path : str) -> Path:
+    """
+    Resolve the configured CuraEngine path once per distinct setting.
+    
+    Args:
+        configured_path: CuraEngine path as written in secrets.json
+        
+    Returns:
+        Absolute path to the CuraEngine executable
+    """
+    return Path(configured_path).resolve()
 
 
 def slice_with_curaengine(
@@ -157,9 +255,11 @@ def slice_with_curaengine(
         TimeoutError: If CuraEngine takes too long
     """
 
-    stl_path = Path(stl_path).resolve()
-    output_dir = Path(output_dir).resolve()
-    config_path = Path(config_path).resolve()
+    # Relative paths are used as given; CuraEngine runs in the same working
+    # directory, so resolving them only costs extra filesystem lookups.
+    stl_path = Path(stl_path)
+    output_dir = Path(output_dir)
+    config_path = Path(config_path)
 
     if not stl_path.exists():
         raise FileNotFoundError(f"STL file not found: {stl_path}")
@@ -167,14 +267,21 @@ def slice_with_curaengine(
         print(f"STL exists: {stl_path}")
     
     try:
-        cura_engine_path = Path(secrets_utils.get_value_from_json(
-            SECRETS_PATH,"slicing","cura_engine_path")).resolve() 
+        cura_engine_path = _resolve_engine_path(secrets_utils.get_value_from_json(
+            SECRETS_PATH,"slicing","cura_engine_path"))
     except Exception as e:
         raise RuntimeError(f"Failed to get CuraEngine from secrets: {e}")
     
-    validate_environment(cura_engine_path)
-    validate_stl(stl_path)
-    validate_config(config_path)
+    # The checks are independent and mostly wait on process startup or disk,
+    # so run them together; result() re-raises the first failure in order.
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        checks = [
+            executor.submit(validate_environment, cura_engine_path),
+            executor.submit(validate_stl, stl_path),
+            executor.submit(validate_config, config_path),
+        ]
+        for check in checks:
+            check.result()
     
     output_dir.mkdir(parents=True, exist_ok=True)
     
@@ -195,70 +302,100 @@ def slice_with_curaengine(
         "-l", str(stl_path)
     ]
 
-    try:
-        result = subprocess.run(cmd, 
-                                check=False,
-                                stdout = subprocess.PIPE,
-                                stderr = subprocess.PIPE,
-                                stdin = subprocess.PIPE,
-                                #capture_output=True, 
-                                text=True,
-                                encoding='utf-8',
-                                errors = 'replace',
-                                timeout=timeout)
-
-        print("CuraEngine completed with return code: %d", result.returncode)
-        
-        stdout_lines = result.stdout.split("\n")
-        if stdout_lines:
-            for line in stdout_lines[-5:]:
-                if line.strip():
-                    print(line)
-
-        if result.stderr.strip():
-            print("Stderr output")
-            for line in result.stderr.split("\n"):
-                if line.strip():
-                    print(line)
-
-        """
-        print("\n=== ENGINE OUTPUT ===")
-        print("Return code:", result.returncode)
-        print("Stdout (last 10 lines):")
-        print('\n'.join(result.stdout.split('\n')[-10:]))
-        print("Stderr (full):")
-        print(result.stderr)
+    stdout_tail = deque(maxlen=STDOUT_TAIL_LINES)
+    stderr_lines = []
+
+    with subprocess.Popen(cmd,
+                          stdout = subprocess.PIPE,
+                          stderr = subprocess.PIPE,
+                          stdin = subprocess.DEVNULL,
+                          text=True,
+                          encoding='utf-8',
+                          errors = 'replace',
+                          bufsize=1,
+                          # Own process group, so a timeout also kills any
+                          # children a wrapper launcher started
+                          start_new_session=True) as process:
+
+        # Both pipes are drained while the engine runs so neither can fill up
+        # and stall it; only the tail of the verbose stdout is kept.
+        readers = [
+            threading.Thread(target=_drain_lines, args=(process.stdout, stdout_tail.append), daemon=True),
+            threading.Thread(target=_drain_lines, args=(process.stderr, stderr_lines.append), daemon=True),
+        ]
+        for reader in readers:
+            reader.start()
+
+        deadline = time.monotonic() + timeout
+        try:
+            returncode = process.wait(timeout=timeout)
+            # Children left behind by a wrapper can hold the pipes open after
+            # the engine exits, so the readers share the same deadline
+            for reader in readers:
+                reader.join(max(0.0, deadline - time.monotonic()))
+            if any(reader.is_alive() for reader in readers):
+                raise subprocess.TimeoutExpired(cmd, timeout)
+        except subprocess.TimeoutExpired:
+            _kill_process_group(process)
+            for reader in readers:
+                reader.join(KILL_GRACE_PERIOD)
+            raise TimeoutError(f"CuraEngine timed out after {timeout} seconds")
+
+    print(f"CuraEngine completed with return code: {returncode}")
+
+    for line in stdout_tail:
+        if line.strip():
+            print(line)
+
+    if any(line.strip() for line in stderr_lines):
+        print("Stderr output")
+        for line in stderr_lines:
+            if line.strip():
+                print(line)
+
+    if returncode !=0:
+        stdout_text = "\n".join(stdout_tail)
+        stderr_text = "\n".join(stderr_lines)
+        error_msg = f"""
+        CuraEngine Failed with code: {returncode}
+        Command: {' '.join(cmd)}
+        --- STDOUT (last {STDOUT_TAIL_LINES} lines) ---
+        {stdout_text}
+        --- STDERR ---
+        {stderr_text}
         """
+        raise RuntimeError(error_msg)
+
+    if not gcode_path.exists():
+        raise RuntimeError(f"CuraEngine ran successfully but no output file was created at {gcode_path}")
 
-        if result.returncode !=0:
-            error_msg = f"""
-            CuraEngine Failed with code: {result.returncode}
-            Command: {' '.join(cmd)}
-            --- STDOUT ---
-            {result.stdout}
-            --- STDERR ---
-            {result.stderr}
-            """
-            raise RuntimeError(error_msg)
-
-        if not gcode_path.exists():
-            raise RuntimeError(f"CuraEngine ran successfully but no output file was created at {gcode_path}")
-
-        return gcode_path
+    return gcode_path
+
+def _kill_process_group(process : subprocess.Popen) -> None:
+    """
+    Kill a process started with start_new_session and everything in its group.
     
-    except subprocess.TimeoutExpired:
-        raise TimeoutError("CuraEngine timed out after {timeout} seconds")
+    Args:
+        process: Process to kill
+    """
+    if os.name != "posix":
+        process.kill()
+        return
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
 
-    except subprocess.CalledProcessError as e:
-        print(f"\n[FATAL ERROR] {str(e)}")
-        if hasattr(e, "stdout") and e.stdout:
-            print("Last stdout: %s", e.stdout.split("\n")[-5:])
-        if hasattr(e, "stderr") and e.stderr:
-            print("Stderr: %s", e.stderr)
-
-        # 'stdout' in locals():
-        #print("Last output lines:", result.stdout.split('\n')[-5:])
-        raise RuntimeError(f"Slicing failed: {e.stderr}")
+def _drain_lines(stream, sink) -> None:
+    """
+    Read text lines from a pipe until EOF.
+    
+    Args:
+        stream: Text-mode pipe to read from
+        sink: Callable receiving each line without its newline
+    """
+    for line in stream:
+        sink(line.rstrip("\n"))
 
 def main() -> None:
     """Main entry point for the STL processor."""
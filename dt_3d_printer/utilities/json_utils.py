@@ -0,0 +1,16 @@
+import json
+
+try:
+    import orjson
+    loads = orjson.loads
+except ImportError:
+    loads = json.loads
+
+# orjson.JSONDecodeError subclasses this, so one except clause covers both
+JSONDecodeError = json.JSONDecodeError
+
+
+def load_json(json_file):
+    """Read and parse a JSON file, using orjson when it is installed."""
+    with open(json_file, "rb") as f:
+        return loads(f.read())
@@ -1,12 +1,26 @@
-import json
+import copy
+import functools
+import os
+from dt_3d_printer.utilities import json_utils
+
+
+@functools.lru_cache(maxsize=16)
+def _load_json(path, mtime_ns):
+    # mtime_ns is only part of the cache key so an edited file is re-read
+    return json_utils.load_json(path)
 
 
 def get_value_from_json(json_file, key, sub_key):
 
     try:
-        with open(json_file,"r") as f:
-            data = json.load(f)
-            return data[key][sub_key]
+        path = os.fspath(json_file)
+        data = _load_json(path, os.stat(path).st_mtime_ns)
+        value = data[key][sub_key]
+        # The parsed file is cached, so callers get their own copy of lists
+        # and dicts rather than a view into the cache
+        if isinstance(value, (dict, list)):
+            return copy.deepcopy(value)
+        return value
     except FileNotFoundError as e:
         raise FileNotFoundError(f"File not found error: {str(e.args)}")
     except KeyError as e:
@@ -1,6 +1,19 @@
-from setuptools import setup, find_packages
+from setuptools import setup, find_packages, Extension
+
+# The G-code tokenizer extension is optional; without it parse_gcode_fast
+# falls back to the plain parser.
+try:
+    from Cython.Build import cythonize
+    ext_modules = cythonize([
+        Extension("dt_3d_printer.gcode_processor._tokenizer",
+                  ["dt_3d_printer/gcode_processor/_tokenizer.pyx"])
+    ])
+except ImportError:
+    ext_modules = []
+
 setup(
     name = "dt_3d_printer",
-    packages= find_packages()
+    packages= find_packages(),
+    ext_modules = ext_modules
 
 )
\ No newline at end of file
@@ -0,0 +1,110 @@
+import pytest
+
+from dt_3d_printer.gcode_processor import gcode_parser
+from dt_3d_printer.gcode_processor.gcode_parser import GCodeParser
+
+
+def _parse_str(parser, gcode):
+    parser.parse_gcode(gcode)
+
+
+def _parse_bytes(parser, gcode):
+    parser.parse_gcode_bytes(gcode.encode("utf-8"))
+
+
+def _parse_tokenizer(parser, gcode):
+    parser.parse_gcode_fast(gcode.encode("utf-8"))
+
+
+@pytest.fixture(params=[_parse_str, _parse_bytes, _parse_tokenizer],
+                ids=["parse_gcode", "parse_gcode_bytes", "tokenizer"])
+def parse(request):
+    """Parse G-code text with a fresh parser through each parse path."""
+    if request.param is _parse_tokenizer and gcode_parser._fast_path() is None:
+        pytest.skip("numba or the _tokenizer extension is not available")
+
+    def run(gcode):
+        parser = GCodeParser()
+        request.param(parser, gcode)
+        return parser
+
+    return run
+
+
+def _layers(parser):
+    """Layer number -> list of [X, Y, Z, E, F] points, in layer order."""
+    layers = parser.get_absolute_coordinates()["layers"]
+    return [(layer, points.tolist()) for layer, points in layers.items()]
+
+
+def test_revisited_layer_keeps_first_appearance_order(parse):
+    parser = parse(";LAYER:0\nG1 X1\n;LAYER:1\nG1 X2\n;LAYER:0\nG1 X3\n")
+
+    assert _layers(parser) == [
+        (0, [[1, 0, 0, 0, 0], [3, 0, 0, 0, 0]]),
+        (1, [[2, 0, 0, 0, 0]]),
+    ]
+
+
+def test_points_before_first_layer_marker(parse):
+    parser = parse("G1 X1\n;LAYER:2\nG1 X2\n")
+
+    assert _layers(parser) == [(0, [[1, 0, 0, 0, 0]]), (2, [[2, 0, 0, 0, 0]])]
+
+
+def test_points_before_markers_come_first_when_their_layer_is_marked_later(parse):
+    parser = parse("G1 X1\n;LAYER:3\nG1 X2\n;LAYER:0\nG1 X3\n")
+
+    assert _layers(parser) == [
+        (0, [[1, 0, 0, 0, 0], [3, 0, 0, 0, 0]]),
+        (3, [[2, 0, 0, 0, 0]]),
+    ]
+
+
+def test_relative_positioning_with_relative_extrusion(parse):
+    parser = parse("G91\nM83\nG1 X1 E0.5 F1200\nG1 X1 E0.5\n")
+
+    assert _layers(parser) == [(0, [[1, 0, 0, 0.5, 1200], [2, 0, 0, 1.0, 1200]])]
+
+
+def test_relative_positioning_keeps_absolute_extrusion(parse):
+    parser = parse("G91\nG1 X1 E0.5\nG1 X1 E0.5\n")
+
+    assert _layers(parser) == [(0, [[1, 0, 0, 0.5, 0], [2, 0, 0, 0.5, 0]])]
+
+
+def test_home_only_resets_named_axes(parse):
+    parser = parse("G1 X5 Y6 Z7\nG28 X\nG1 E1\nG28\n")
+
+    assert _layers(parser) == [(0, [[5, 6, 7, 0, 0], [0, 6, 7, 1, 0]])]
+    assert dict(parser.current_position) == {"X": 0, "Y": 0, "Z": 0, "E": 1, "F": 0}
+
+
+def test_set_position(parse):
+    parser = parse("G1 X5 E10\nG92 E0\nG1 E1\n")
+
+    assert _layers(parser) == [(0, [[5, 0, 0, 10, 0], [5, 0, 0, 1, 0]])]
+
+
+def test_inline_comments_are_ignored(parse):
+    parser = parse("G1 X1 ; Y9 should not move\n;TYPE:WALL-OUTER\nG1 Y2;E5\n")
+
+    assert _layers(parser) == [(0, [[1, 0, 0, 0, 0], [1, 2, 0, 0, 0]])]
+    assert parser.get_absolute_coordinates()["metadata"] == {"TYPE": "WALL-OUTER"}
+
+
+def test_crlf_line_endings(parse):
+    parser = parse(";FLAVOR:Marlin\r\nG1 X1\r\n;LAYER:1\r\nG1 X2 Y3\r\nG28 Y\r\nG1 X4\r\n")
+
+    assert _layers(parser) == [
+        (0, [[1, 0, 0, 0, 0]]),
+        (1, [[2, 3, 0, 0, 0], [4, 0, 0, 0, 0]]),
+    ]
+    assert parser.get_absolute_coordinates()["metadata"] == {"FLAVOR": "Marlin"}
+
+
+def test_layer_marker_needs_no_space_after_semicolon(parse):
+    parser = parse("G1 X1\n; LAYER:4\nG1 X2\n")
+
+    assert _layers(parser) == [(0, [[1, 0, 0, 0, 0], [2, 0, 0, 0, 0]])]
+    assert parser.get_absolute_coordinates()["metadata"] == {"LAYER": "4"}
@@ -0,0 +1,127 @@
+import numpy as np
+
+from dt_3d_printer.gcode_processor import gcode_parser_kernels as kernels
+
+AXES = "XYZEF"
+
+
+def _row(op, **axes):
+    """Build an (opcode, axis mask, values) row from axis keyword values."""
+    mask = 0
+    values = [0.0] * len(AXES)
+    for axis, value in axes.items():
+        i = AXES.index(axis)
+        mask |= 1 << i
+        values[i] = value
+    return op, mask, values
+
+
+def _layer_row(layer):
+    return kernels.OP_LAYER, 0, [layer, 0.0, 0.0, 0.0, 0.0]
+
+
+def _run(rows, pos=(0.0, 0.0, 0.0, 0.0, 0.0), absolute=True, absolute_e=True, layer=0):
+    """Run the kernel over rows and return (points, point layers, pos, modes)."""
+    opcodes = np.array([op for op, _, _ in rows], dtype=np.int64)
+    masks = np.array([mask for _, mask, _ in rows], dtype=np.int64)
+    values = np.array([vals for _, _, vals in rows], dtype=np.float64).reshape(-1, len(AXES))
+    pos = np.array(pos, dtype=np.float64)
+    modes = np.array([absolute, absolute_e, layer], dtype=np.int64)
+    out_xyzef = np.empty((len(rows), len(AXES)), dtype=np.float64)
+    out_layer = np.empty(len(rows), dtype=np.int64)
+
+    n = kernels.run(opcodes, masks, values, pos, modes, out_xyzef, out_layer)
+    return out_xyzef[:n].tolist(), out_layer[:n].tolist(), pos.tolist(), modes.tolist()
+
+
+def test_absolute_moves_emit_changed_positions():
+    points, layers, pos, _ = _run([
+        _row(kernels.OP_MOVE, X=1, Y=2, F=1200),
+        _row(kernels.OP_MOVE, X=1, Y=2),
+        _row(kernels.OP_MOVE, F=600),
+        _row(kernels.OP_MOVE, E=3),
+    ])
+
+    assert points == [[1, 2, 0, 0, 1200], [1, 2, 0, 3, 600]]
+    assert layers == [0, 0]
+    assert pos == [1, 2, 0, 3, 600]
+
+
+def test_relative_positioning_with_relative_extrusion():
+    points, _, _, _ = _run([
+        _row(kernels.OP_MOVE, X=1, E=0.5),
+        _row(kernels.OP_MOVE, X=1, E=0.5),
+    ], absolute=False, absolute_e=False)
+
+    assert points == [[1, 0, 0, 0.5, 0], [2, 0, 0, 1.0, 0]]
+
+
+def test_relative_positioning_keeps_absolute_extrusion():
+    points, _, _, _ = _run([
+        _row(kernels.OP_MOVE, X=1, E=0.5),
+        _row(kernels.OP_MOVE, X=1, E=0.5),
+    ], absolute=False, absolute_e=True)
+
+    assert points == [[1, 0, 0, 0.5, 0], [2, 0, 0, 0.5, 0]]
+
+
+def test_absolute_positioning_ignores_relative_extrusion_flag():
+    points, _, _, _ = _run([
+        _row(kernels.OP_MOVE, E=1),
+        _row(kernels.OP_MOVE, E=1),
+    ], absolute=True, absolute_e=False)
+
+    assert points == [[0, 0, 0, 1, 0]]
+
+
+def test_mode_rows_switch_positioning():
+    points, _, _, modes = _run([
+        _row(kernels.OP_RELATIVE),
+        _row(kernels.OP_RELATIVE_E),
+        _row(kernels.OP_MOVE, X=1, E=1),
+        _row(kernels.OP_MOVE, X=1, E=1),
+        _row(kernels.OP_ABSOLUTE),
+        _row(kernels.OP_ABSOLUTE_E),
+        _row(kernels.OP_MOVE, X=1, E=1),
+    ])
+
+    assert points == [[1, 0, 0, 1, 0], [2, 0, 0, 2, 0], [1, 0, 0, 1, 0]]
+    assert modes[kernels.MODE_ABSOLUTE] == 1
+    assert modes[kernels.MODE_ABSOLUTE_E] == 1
+
+
+def test_home_resets_only_masked_axes():
+    points, _, pos, _ = _run([_row(kernels.OP_HOME, X=0)], pos=(5, 6, 7, 1, 100))
+
+    assert points == []
+    assert pos == [0, 6, 7, 1, 100]
+
+
+def test_home_without_axes_resets_xyz():
+    _, _, pos, _ = _run([_row(kernels.OP_HOME)], pos=(5, 6, 7, 1, 100))
+
+    assert pos == [0, 0, 0, 1, 100]
+
+
+def test_set_position_only_sets_given_axes():
+    points, _, pos, _ = _run([
+        _row(kernels.OP_SET_POSITION, X=2, E=0),
+        _row(kernels.OP_MOVE, E=1),
+    ], pos=(5, 6, 7, 10, 100))
+
+    assert points == [[2, 6, 7, 1, 100]]
+    assert pos == [2, 6, 7, 1, 100]
+
+
+def test_layer_rows_tag_following_points():
+    points, layers, _, modes = _run([
+        _row(kernels.OP_MOVE, X=1),
+        _layer_row(3),
+        _row(kernels.OP_MOVE, X=2),
+        _layer_row(1),
+        _row(kernels.OP_MOVE, X=3),
+    ], layer=7)
+
+    assert points == [[1, 0, 0, 0, 0], [2, 0, 0, 0, 0], [3, 0, 0, 0, 0]]
+    assert layers == [7, 3, 1]
+    assert modes[kernels.MODE_LAYER] == 1
@@ -0,0 +1,75 @@
+import struct
+
+import pytest
+
+from dt_3d_printer.gcode_processor.stl_processor import _fast_stl_check, check_file_access
+
+
+def _binary_stl(triangle_count, header=b"binary stl", stored_count=None):
+    """Binary STL bytes with zeroed triangles and an optional wrong stored count."""
+    if stored_count is None:
+        stored_count = triangle_count
+    return (header.ljust(80, b"\0")
+            + struct.pack("<I", stored_count)
+            + b"\0" * (50 * triangle_count))
+
+
+def test_binary_stl_returns_triangle_count(tmp_path):
+    stl_path = tmp_path / "cube.stl"
+    stl_path.write_bytes(_binary_stl(12))
+
+    assert _fast_stl_check(stl_path) == 12
+
+
+def test_binary_stl_with_solid_header_is_binary(tmp_path):
+    stl_path = tmp_path / "exported.stl"
+    stl_path.write_bytes(_binary_stl(3, header=b"solid exported by a CAD tool"))
+
+    assert _fast_stl_check(stl_path) == 3
+
+
+def test_truncated_binary_stl_is_invalid(tmp_path):
+    stl_path = tmp_path / "truncated.stl"
+    stl_path.write_bytes(_binary_stl(1, stored_count=2))
+
+    with pytest.raises(ValueError):
+        _fast_stl_check(stl_path)
+
+
+def test_short_file_is_invalid(tmp_path):
+    stl_path = tmp_path / "short.stl"
+    stl_path.write_bytes(b"not an stl")
+
+    with pytest.raises(ValueError):
+        _fast_stl_check(stl_path)
+
+
+def test_ascii_stl_returns_none(tmp_path):
+    stl_path = tmp_path / "ascii.stl"
+    stl_path.write_text(
+        "solid cube\n"
+        "  facet normal 0 0 1\n"
+        "    outer loop\n"
+        "      vertex 0 0 0\n"
+        "      vertex 1 0 0\n"
+        "      vertex 0 1 0\n"
+        "    endloop\n"
+        "  endfacet\n"
+        "endsolid cube\n")
+
+    assert _fast_stl_check(stl_path) is None
+
+
+def test_check_file_access_regular_file(tmp_path):
+    file_path = tmp_path / "config.json"
+    file_path.write_text("{}")
+
+    assert check_file_access(file_path)
+
+
+def test_check_file_access_directory(tmp_path):
+    assert not check_file_access(tmp_path)
+
+
+def test_check_file_access_missing_path(tmp_path):
+    assert not check_file_access(tmp_path / "missing.json")